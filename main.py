@@ -1,19 +1,25 @@
+import numpy as np
 import pandas as pd
 import yfinance as yf
-import plotly.graph_objects as go
 import streamlit as st
-import plotly.express as px
 import os
 import time
+from concurrent.futures import Future
 from src.data import dataset
-from src.streaks import movement_direction, run_summary
+from src.streaks import run_summary
 from src.indicator import calculate_sma, daily_returns
-from src.max_profit import max_profit_with_days
+from src.resample import build_pyramid, choose_resolution
+from src.executor import AnalyticsBackend
+from src.correlation import align_closes, co_movement, rolling_correlation_frame
+from src.store import BarStore, STORE_ENV
+from src.figures import fingerprint, close_sma_figure, returns_figure, runs_figure, trades_figure, heatmap_figure, lines_figure
 
 #maps user-friendly period labels to yfinance format
 #Specifies periods in dropdown input
 PERIOD = {"1M": "1mo", "3M": "3mo", "6M": "6mo", "1Y": "1y", "2Y": "2y", "3Y":"3y"}
 DATE_FORMATS = ("%d-%b-%y", "%Y-%m-%d") #defines date formats for display
+MIN_CANDLES = 100 #coarsest resolution used for the candlestick chart must still have this many candles
+CACHE_TTL = 15 * 60 #seconds before cached downloads/aggregates are refreshed
 
 # WEB INTERFACE START
 #=========================================================================
@@ -70,8 +76,28 @@ if not ticker: #check if ticker is selected
 
 st.subheader(f"Displaying data for: {ticker}") #adds subheader to web interface indicating current stock being analyzed
 
-def _get_df(_ticker: str, _period: str) -> pd.DataFrame: #gets base df from dataset function for graph visualisations
-    return dataset(_ticker, _period) # calls dataset() function
+@st.cache_resource
+def _get_backend() -> AnalyticsBackend: #one worker pool shared by every session (STOCK_ANALYSIS_INPROCESS=1 runs in-process)
+    return AnalyticsBackend()
+
+@st.cache_resource
+def _get_store() -> BarStore | None: #memory-mapped bar store shared by every session/process (set STOCK_ANALYSIS_STORE to a directory)
+    root = os.environ.get(STORE_ENV)
+    return BarStore(root, max_age=CACHE_TTL) if root else None #refetched as often as the non-store path
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _fetch_df(ticker: str, period: str) -> pd.DataFrame: #per-process cached copy when no store is configured
+    return dataset(ticker, period) # calls dataset() function
+
+def _get_df(ticker: str, period: str) -> pd.DataFrame: #gets base df from dataset function for graph visualisations
+    store = _get_store()
+    if store is not None:
+        return dataset(ticker, period, store=store) #zero-copy view on the store, no per-session copy
+    return _fetch_df(ticker, period)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _get_pyramid(data_key: str, _df: pd.DataFrame) -> dict: #hourly/daily/weekly/monthly OHLCV aggregates, shared read-only (no copy per rerun)
+    return build_pyramid(_df) #keyed on the data fingerprint, so an updated bar rebuilds it together with base_df
 
 try: #attempts to load data
     base_df = _get_df(ticker, period) #if successful, shows date range
@@ -79,9 +105,49 @@ try: #attempts to load data
 except Exception as e: #if fail
     st.error(f"Failed to retrieve data: {e}") #show error message
     st.stop()                                 #stops execution
+data_key = fingerprint(base_df) #content hash of the daily data: cache key for everything derived from it
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _get_co_movement(tickers: tuple, period: str) -> dict: #returns/correlation/co-occurrence cached per (universe, period) only
+    frames = {}
+    for symbol in tickers:
+        try:
+            frames[symbol] = _get_df(symbol, period)
+        except Exception: #skip tickers that fail to download
+            continue
+    return co_movement(align_closes({k: v for k, v in frames.items() if not v.empty}))
+
+# Worker pool tasks are submitted once per distinct data: reruns (slider moves etc.) reuse the shared futures,
+# whose results must be treated as read-only
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _runs_future(data_key: str, level: str, _df: pd.DataFrame) -> Future: #Direction/RunID/RunLength of one pyramid level
+    return _get_backend().submit_movement_direction(_df)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _profit_future(data_key: str, _df: pd.DataFrame) -> Future: #max profit trades
+    return _get_backend().submit_max_profit(_df["Close"].to_numpy(dtype=float))
+
+def _analytics(cached, *args) -> Future: #cached future, resubmitted if it failed (e.g. a worker crashed)
+    fut = cached(*args)
+    if fut.done() and (fut.cancelled() or fut.exception() is not None):
+        cached.clear(*args)
+        fut = cached(*args)
+    return fut
+
+# Start the heavy analytics in the worker pool now so tab 1 renders while they run
+runs_future = _analytics(_runs_future, data_key, "base", base_df) #Direction & RunLength for tab 2
+
+# Candlestick at the coarsest resolution that still fills the chart, so the number of candles stays bounded
+pyramid = _get_pyramid(data_key, base_df)
+level = choose_resolution(pyramid, min_bars=MIN_CANDLES)
+if pyramid[level].index.equals(base_df.index): #native resolution: the daily runs already are the bar runs
+    bars_future = runs_future
+else: #runs recomputed on the aggregated bars so shading matches the candles
+    bars_future = _analytics(_runs_future, data_key, level, pyramid[level])
+profit_future = _analytics(_profit_future, data_key, base_df) #buy/sell trades for tab 3
 
 # Tabs for web interface
-tab1, tab2, tab3= st.tabs(["Close vs SMA", "Upward/Downward Runs", "Max profit(Buy/Sell)"]) #Creates 3 tabs
+tab1, tab2, tab3, tab4 = st.tabs(["Close vs SMA", "Upward/Downward Runs", "Max profit(Buy/Sell)", "Correlation"]) #Creates 4 tabs
 
 # Tab 1: Close vs SMA 
 with tab1:
@@ -90,36 +156,19 @@ with tab1:
     if "Daily Returns" not in df1.columns: #ensure daily returns exist in dataframe
         df1 = daily_returns(df1)
 
-    hover_ret = df1["Daily Returns"].fillna("—").to_numpy() #replaces missing returns with "-" and converts to NumPy for Plotly hover tooltips                                          
-
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter
-                   (x=df1.index, #X = Date
-                    y=df1["Close"], #Y = Close value
-                    mode="lines", # Line Graph
-                    name="Close", # Graph Name
-                    customdata=hover_ret, # Daily Returns Value
-                    hovertemplate="Date:%{x|%Y-%m-%d}<br>""Close:%{y:.2f}<br>""Daily Return:%{customdata}<extra></extra>")) #Formatting of data in display container
-    fig1.add_trace(go.Scatter(x=df1.index, # X = Date
-                              y=df1["SMA"], # Y = SMA value
-                              mode="lines", # Line Graph
-                              name=f"SMA{sma_window}", # SMA Values
-                              hovertemplate="Date=%{x|%Y-%m-%d}<br>"f"SMA{sma_window}=%{{y:.2f}}<extra></extra>")) #Formatting of data in display container
-    fig1.update_layout(margin=dict(l=10, r=10, t=30, b=10), legend_title=None) #Graph layout
-    st.plotly_chart(fig1, use_container_width=True)
+    # Figures are cached by (data fingerprint, parameters); hover returns stay numeric
+    st.plotly_chart(close_sma_figure(df1, sma_window), use_container_width=True)
 
     #Daily Returns graph (volatility)
-    df1 = daily_returns(df1)
     st.header("Daily Returns Analysis")
-    fig2 = px.line(df1, x=df1.index, y=f"Daily Returns", title='Daily Volatility')
-    fig2.update_traces(line_color='orange')
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(returns_figure(df1), use_container_width=True)
 
 # Tab 2: Shaded candlestick graph with up/down runs
 with tab2:
-    df2 = calculate_sma(base_df.copy(), window=sma_window) #Create copy of base dataframe
-    df2 = daily_returns(df2)             #Stores daily return values into dataframe "df2"
-    enriched = movement_direction(df2)   #Storing Direction & RunLength into dataframe "enriched"
+    with st.spinner("Detecting up/down runs..."):
+        enriched = runs_future.result().copy()  #Direction & RunLength computed by the worker pool (copied: shared result, SMA is added in place)
+    enriched = calculate_sma(enriched, window=sma_window) #Adds SMA to dataframe "enriched"
+    enriched = daily_returns(enriched)   #Stores daily return values into dataframe "enriched"
 
     def _fmt_range(rr):
         if rr is None: return "—"
@@ -128,49 +177,23 @@ with tab2:
     
     summary = run_summary(enriched)
 
-    # KPI tiles
+    # KPI tiles (daily rows, like the table below)
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("UP runs",   summary["no_up_runs"])
     c2.metric("DOWN runs", summary["no_down_runs"])
     c3.metric("Longest UP",   f'{summary["longest_up_length"]}',   _fmt_range(summary["longest_up_range"]))
     c4.metric("Longest DOWN", f'{summary["longest_down_length"]}', _fmt_range(summary["longest_down_range"]))
    
-    fig2 = go.Figure([ #candlestick chart showing OHLC data
-        go.Candlestick(
-            x=enriched.index, #Date
-            open=enriched["Open"], #Gets open value from enriched dataframe
-            high=enriched["High"], #Gets high value from enriched dataframe
-            low=enriched["Low"], #Gets low value from enriched dataframe
-            close=enriched["Close"], #Gets close value from enriched dataframe
-            increasing_line_color="green", #Green for upward runs
-            decreasing_line_color="red", #Red for downward runs
-            name="OHLC")]) #Name of chart
-    runs = enriched[enriched["Direction"].isin(["UP","DOWN"])].copy() #filter rows where movement direction is either up or down
-    # identify run boundaries
-    is_new = (runs["Direction"] != runs["Direction"].shift(1)).fillna(True) #marks start of new run when direction changes
-    run_ids = is_new.cumsum() #assigns unique ID to each run using cumulative sum
-    shapes = [] #create empty list to hold all rectangles
-    for _, grp in runs.groupby(run_ids):
-        d = grp["Direction"].iloc[0]
-        x0, x1 = grp.index.min(), grp.index.max() + pd.Timedelta(days=1)
-        shapes.append(dict(type="rect", xref="x", yref="paper", #creates a shape dictionary and adds it to list
-                       x0=x0, x1=x1, y0=0, y1=1,
-                       fillcolor=("green" if d == "UP" else "red"),
-                       opacity=0.08, line_width=0))
-    fig2.update_layout(shapes=shapes) #apply all shapes at once
-
-    # concise KPI annotations on the chart
-    fig2.add_annotation(
-        xref="paper", yref="paper", x=0.01, y=1.07, showarrow=False, align="left",
-        text=f"Longest UP: {summary['longest_up_length']} ({_fmt_range(summary['longest_up_range'])})"
-    )
-    fig2.add_annotation(
-        xref="paper", yref="paper", x=0.40, y=1.07, showarrow=False, align="left",
-        text=f"Longest DOWN: {summary['longest_down_length']} ({_fmt_range(summary['longest_down_range'])})"
-    )
+    with st.spinner("Detecting runs on the chart bars..."):
+        bars = bars_future.result() #the daily runs at native resolution, else the aggregated bars' runs
+    bar_summary = run_summary(bars) #annotations describe the candles actually drawn, not the daily rows
 
-    fig2.update_layout(margin=dict(l=10, r=10, t=60, b=10), legend_title=None)
-    st.plotly_chart(fig2, use_container_width=True)
+    # Shaded candlestick with concise KPI annotations on the chart
+    annotations = (
+        f"Longest UP: {bar_summary['longest_up_length']} × {level} ({_fmt_range(bar_summary['longest_up_range'])})",
+        f"Longest DOWN: {bar_summary['longest_down_length']} × {level} ({_fmt_range(bar_summary['longest_down_range'])})",
+    )
+    st.plotly_chart(runs_figure(bars, level, annotations), use_container_width=True)
 
     # Table displaying Close, SMA, Direction, RunLength
     show_cols = ["Close", "SMA", "Direction", "RunLength"]
@@ -182,59 +205,67 @@ with tab2:
 
 # Tab 3: Max profit (Buy/Sell)
 with tab3:
-    
-    df3 = calculate_sma(base_df.copy(), window=sma_window) #Creates copy of base dataframe
-    #extract close prices and dates
-    prices = df3["Close"].tolist()
-    dates = list(df3.index)
+    dates = base_df.index #dates to map trade day positions onto
 
-    total_profit, transactions = max_profit_with_days(prices) #calls function to calculate buy/sell trades for max profit
+    with st.spinner("Calculating max profit trades..."):
+        total_profit, trades = profit_future.result() #buy/sell trades for max profit (structured array) from the worker pool
 
-    # Creating arrays for plotting of graph and table
-    # b = buy date, s = sell date, bp = buy price, sp = sell price
-    buy_x   = [dates[b]   for (b, _, _, _) in transactions]
-    buy_y   = [prices[b]  for (b, _, _, _) in transactions]
-    sell_x  = [dates[s]   for (_, s, _, _) in transactions]
-    sell_y  = [prices[s]  for (_, s, _, _) in transactions]
-    profit = [sp - bp    for (_, _, bp, sp) in transactions] # per trade profit or loss (sell price - buy price)
+    # Columns of the trades array feed the graph and table directly
+    buy_x = dates[trades["buy_day"]]
+    buy_y = trades["buy_price"]
+    sell_x = dates[trades["sell_day"]]
+    sell_y = trades["sell_price"]
+    profit = sell_y - buy_y # per trade profit or loss (sell price - buy price)
 
     # Chart
-    fig3 = go.Figure()
-    fig3.add_trace(go.Scatter(
-        x=df3.index, 
-        y=df3["Close"], 
-        mode="lines", 
-        name="Close")) #add line chart of closing prices
-    fig3.add_trace(go.Scatter(
-        x=buy_x, 
-        y=buy_y, 
-        mode="markers", 
-        name="Buy",
-        marker=dict(symbol="triangle-up", size=10, color="green"),
-        hovertemplate="Buy<br>Date=%{x|%Y-%m-%d}<br>Price=%{y:.2f}<extra></extra>")) #adds green triangle markers for buy signals with hover info showing date and price
-    fig3.add_trace(go.Scatter(
-        x=sell_x, 
-        y=sell_y, 
-        mode="markers", 
-        name="Sell",
-        marker=dict(symbol="triangle-down", size=10, color="red"),
-        customdata=profit,hovertemplate=("Sell<br>Date=%{x|%Y-%m-%d}<br>""Price=%{y:.2f}<br>""Trade P/L=%{customdata:.2f}<extra></extra>"))) #adds red triangle for sell signals with hover info showing data, price and profit/loss
-    fig3.update_layout(margin=dict(l=10, r=10, t=30, b=10), legend_title=None)
-    st.plotly_chart(fig3, use_container_width=True)
+    st.plotly_chart(trades_figure(base_df["Close"], trades), use_container_width=True)
 
     #Total profit value and table
     st.metric("Total P/L (sum of all trades)", f"{total_profit:.2f}") #displays total profit/loss as a metric above the table
-    if transactions: #checks if any trades were made
+    if len(trades): #checks if any trades were made
         transaction_df = pd.DataFrame({ #creates dataframe summarizing each trade
-            "Trade Number":range(1, len(transactions) + 1), #range from 1 to max number of transactions + 1
-            "Buy Date":[dates[b].date() for (b, _, _, _) in transactions], #get buy date from transaction dataframe
-            "Sell Date":[dates[s].date() for (_, s, _, _) in transactions], #get sell date from transaction dataframe
-            "Buy Price":[bp for (_, _, bp, _) in transactions], #get buy price from transaction dataframe
-            "Sell Price":[sp for (_, _, _, sp) in transactions], #get sell price from transaction dataframe
-            "Trade P/L":[sp - bp for (_, _, bp, sp) in transactions], #calculates profit/loss
+            "Trade Number":np.arange(1, len(trades) + 1), #range from 1 to number of trades
+            "Buy Date":buy_x.tz_localize(None).normalize(), #buy dates taken from the trades array (datetime64, no per-trade objects)
+            "Sell Date":sell_x.tz_localize(None).normalize(), #sell dates taken from the trades array
+            "Buy Price":buy_y, #buy prices column
+            "Sell Price":sell_y, #sell prices column
+            "Trade P/L":profit, #profit/loss per trade
+        })
+        st.dataframe(transaction_df, use_container_width=True, column_config={ #show dates without the time part
+            "Buy Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "Sell Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
         })
-        st.dataframe(transaction_df, use_container_width=True)
     else:
         st.info("No profitable trades detected in the selected period.") #if no trades were made, shows info message
+
+# Tab 4: Cross-ticker correlation and streak co-occurrence
+with tab4:
+    universe = st.multiselect("Tickers", TICKER_OPTIONS, default=TICKER_OPTIONS) #set of tickers to compare
+    corr_window = st.slider("Rolling correlation window (days)", min_value=10, max_value=120, value=30, step=5)
+    if len(universe) < 2:
+        st.info("Select at least two tickers to compare.")
+    else:
+        try:
+            with st.spinner("Aligning returns..."):
+                co = _get_co_movement(tuple(sorted(universe)), period)
+        except Exception as e: #e.g. no overlapping dates between the selected tickers
+            st.error(f"Failed to compute correlations: {e}")
+            co = None
+        if co is not None:
+            st.caption(f"{len(co['returns'])} common trading days across {co['returns'].shape[1]} tickers")
+            c1, c2 = st.columns(2)
+            with c1:
+                st.subheader("Return correlation")
+                st.plotly_chart(heatmap_figure(co["correlation"], zmin=-1, zmax=1, colorscale="RdBu",
+                                               reversescale=True, label="Correlation"), use_container_width=True)
+            with c2:
+                st.subheader("Streak co-occurrence")
+                st.plotly_chart(heatmap_figure(co["cooccurrence"], zmin=0, zmax=1, colorscale="Greens",
+                                               label="Same-direction run days", fmt=".0%"), use_container_width=True)
+
+            ref = ticker if ticker in co["returns"].columns else co["returns"].columns[0] #reference ticker = currently selected ticker
+            st.subheader(f"Rolling {corr_window}-day correlation vs {ref}")
+            rolling = rolling_correlation_frame(co["returns"], corr_window, ref).drop(columns=[ref]) #O(days x tickers), recomputed per window/reference
+            st.plotly_chart(lines_figure(rolling, yrange=(-1, 1)), use_container_width=True)
 #===============================================================================================================
 # WEB INTERFACE END
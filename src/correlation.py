@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Dict, Mapping
+import numpy as np
+import pandas as pd
+
+from src.streaks import require_columns
+
+__all__ = ["align_closes", "correlation_matrix", "rolling_correlation",
+           "streak_cooccurrence", "co_movement", "rolling_correlation_frame"]
+
+
+# ---------- Alignment ----------
+def align_closes(frames: Mapping[str, pd.DataFrame], *, close_col: str = "Close") -> pd.DataFrame:
+    """
+    Put each ticker's close on a common date index (dates x tickers).
+    Intraday timestamps/timezones are dropped to calendar dates; only dates every
+    ticker traded on are kept.
+    """
+    if not frames:
+        raise ValueError("frames is empty")
+    cols = {}
+    for ticker, df in frames.items():
+        require_columns(df, [close_col])
+        close = pd.to_numeric(df[close_col], errors="coerce")
+        idx = pd.DatetimeIndex(close.index)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        close.index = idx.normalize()
+        cols[ticker] = close[~close.index.duplicated(keep="last")]
+    return pd.concat(cols, axis=1, join="inner").dropna()
+
+
+def _returns(closes: np.ndarray) -> np.ndarray:
+    """Simple returns along axis 0 (one row shorter than closes); non-finite returns (zero close) -> NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = closes[1:] / closes[:-1] - 1.0
+    rets[~np.isfinite(rets)] = np.nan
+    return rets
+
+
+# ---------- Public API ----------
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between the columns of a 2-D (T x N) returns array.
+    Columns with zero variance get NaN rows/columns. Non-finite values are skipped
+    pairwise (each pair uses the rows where both are finite), like DataFrame.corr.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    if r.ndim != 2:
+        raise ValueError("returns must be a 2-D (T x N) array")
+    valid = np.isfinite(r)
+    if valid.all():
+        z = r - r.mean(axis=0)
+        std = np.sqrt((z * z).sum(axis=0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = z / np.where(std > 0, std, np.nan)
+        return z.T @ z
+
+    # Pairwise-complete sums as matrix products: entry [i, j] only sees rows valid in both
+    m = valid.astype(np.float64)
+    x = np.where(valid, r, 0.0)
+    n = m.T @ m
+    sx, sxx = x.T @ m, (x * x).T @ m  # sums of column i over rows where j is valid
+    cov = n * (x.T @ x) - sx * sx.T
+    var = n * sxx - sx * sx  # var.T is the variance of column j over the same rows
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var * var.T)
+    flat = var <= 1e-12 * n * sxx  # zero up to rounding
+    corr[flat | flat.T | (n < 2)] = np.nan  # undefined
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_correlation(returns: np.ndarray, window: int, ref: int = 0) -> np.ndarray:
+    """
+    Rolling correlation of every column against column `ref` over `window` rows.
+    Returns a T x N array; the first window-1 rows are NaN, as is every window holding a
+    non-finite value in either column (pandas rolling().corr semantics).
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    if r.ndim != 2:
+        raise ValueError("returns must be a 2-D (T x N) array")
+    if window < 2:
+        raise ValueError("window must be at least 2")
+
+    T = r.shape[0]
+    out = np.full(r.shape, np.nan)
+    if T < window:
+        return out
+
+    # Zero out non-finite pairs so one bad row cannot poison every later cumulative sum
+    valid = np.isfinite(r) & np.isfinite(r[:, [ref]])
+    y = np.where(valid, r, 0.0)
+    x = np.where(valid, r[:, [ref]], 0.0)
+
+    # Window sums via cumulative sums: O(T*N) regardless of window length
+    def _win(a: np.ndarray) -> np.ndarray:
+        c = np.cumsum(np.vstack([np.zeros((1, a.shape[1])), a]), axis=0)
+        return c[window:] - c[:-window]
+
+    sx, sy = _win(x), _win(y)
+    sxy, sxx, syy = _win(x * y), _win(x * x), _win(y * y)
+    cov = sxy - sx * sy / window
+    vx = sxx - sx * sx / window
+    vy = syy - sy * sy / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(vx * vy)
+    corr[(vx <= 1e-15) | (vy <= 1e-15)] = np.nan  # flat window, undefined
+    corr[_win(valid.astype(np.float64)) < window - 0.5] = np.nan  # window holds a masked row
+    out[window - 1:] = np.clip(corr, -1.0, 1.0)
+    return out
+
+
+def streak_cooccurrence(closes: np.ndarray) -> np.ndarray:
+    """
+    How often two tickers' runs overlap, for a 2-D (T x N) close array.
+
+    Days are classified like movement_direction (UP / DOWN / FLAT, NaN -> FLAT).
+    Entry [i, j] is the share of days on which both tickers were in a run that they
+    moved the same way; NaN if they never were in a run on the same day.
+    """
+    c = np.asarray(closes, dtype=np.float64)
+    if c.ndim != 2:
+        raise ValueError("closes must be a 2-D (T x N) array")
+    delta = np.diff(c, axis=0)
+    up = (delta > 0).astype(np.float64)
+    down = (delta < 0).astype(np.float64)
+    in_run = up + down
+
+    same = up.T @ up + down.T @ down
+    both = in_run.T @ in_run
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(both > 0, same / both, np.nan)
+
+
+def co_movement(closes: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Returns, correlation and streak co-occurrence for an aligned dates x tickers close
+    frame (see align_closes). Depends only on the universe and dates, so it can be cached
+    on those; rolling correlations are built from "returns" with rolling_correlation_frame.
+    """
+    tickers = list(closes.columns)
+    values = closes.to_numpy(dtype=np.float64)
+    rets = _returns(values)
+
+    return {
+        "returns": pd.DataFrame(rets, index=closes.index[1:], columns=tickers),
+        "correlation": pd.DataFrame(correlation_matrix(rets), index=tickers, columns=tickers),
+        "cooccurrence": pd.DataFrame(streak_cooccurrence(values), index=tickers, columns=tickers),
+    }
+
+
+def rolling_correlation_frame(returns: pd.DataFrame, window: int = 30, ref: str | None = None) -> pd.DataFrame:
+    """Labelled rolling_correlation of every ticker against `ref` (default first ticker)."""
+    tickers = list(returns.columns)
+    ref = tickers[0] if ref is None else ref
+    if ref not in tickers:
+        raise KeyError(f"Reference ticker not in universe: {ref}")
+    return pd.DataFrame(rolling_correlation(returns.to_numpy(dtype=np.float64), window, tickers.index(ref)),
+                        index=returns.index, columns=tickers)
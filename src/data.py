@@ -5,10 +5,23 @@ import os
 from datetime import datetime
 
 # load the dataset
-def dataset(stock, period):
-    stock = yf.Ticker(stock)
-    hist = stock.history(period=period)
+# with a BarStore, reads come from the memory-mapped store and yfinance is only hit
+# when the ticker is missing, stale, or stored for a shorter period
+def dataset(stock, period, store=None):
+    if store is not None and store.covers(stock, period):
+        try:
+            return store.open(stock, period)
+        except (KeyError, OSError, ValueError): # replaced/removed by another process since covers(): fetch instead
+            pass
+    ticker = yf.Ticker(stock)
+    hist = ticker.history(period=period)
     df = pd.DataFrame(hist)
     print("Your dataframe is:\n")
     print(df)
-    return df
\ No newline at end of file
+    if store is not None and not df.empty:
+        store.write(stock, df, period=period)
+        try:
+            return store.open(stock, period)
+        except (KeyError, OSError, ValueError): # fall back to the fetched copy
+            pass
+    return df
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, List, Tuple
+import numpy as np
+import pandas as pd
+
+from src.max_profit import max_profit_trades
+from src.streaks import movement_direction
+
+__all__ = ["AnalyticsBackend", "INPROCESS_ENV"]
+
+# Set to "1" to run every task on the calling thread (tests, debugging, single-core hosts)
+INPROCESS_ENV = "STOCK_ANALYSIS_INPROCESS"
+
+# Array spec sent to a worker instead of the data itself: (shm name, dtype str, shape)
+ArraySpec = Tuple[str, str, Tuple[int, ...]]
+
+
+# ---------- Shared memory transport ----------
+def _share_array(arr: np.ndarray, segments: List[shared_memory.SharedMemory]) -> ArraySpec:
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    segments.append(shm)
+    return shm.name, arr.dtype.str, arr.shape
+
+
+def _attach_array(spec: ArraySpec) -> np.ndarray:
+    """Worker side: copy an array out of its segment and close it (the parent unlinks)."""
+    name, dtype, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+
+_MAIN_LOCK = threading.Lock()
+
+
+@contextmanager
+def _worker_safe_main():
+    """
+    Hide __main__ while workers are spawned. Streamlit registers the app script as
+    __main__, and spawn would re-run the whole dashboard in every new worker. Workers only
+    need src.* (imported by name when a task is unpickled), so an empty module is enough.
+
+    The swap is process-wide: a Streamlit session starting meanwhile sets its own
+    __main__, which is left in place (only our placeholder is put back), but a worker
+    spawned after that would see it. It is therefore only used while a pool starts all
+    of its workers up front (AnalyticsBackend._new_pool), never on a regular submit.
+    """
+    placeholder = types.ModuleType("__main__")
+    with _MAIN_LOCK:
+        main = sys.modules.get("__main__")
+        sys.modules["__main__"] = placeholder
+        try:
+            yield
+        finally:
+            if sys.modules.get("__main__") is placeholder:
+                sys.modules["__main__"] = main
+
+
+# ---------- Worker entry points ----------
+_DIRECTIONS = np.array(["FLAT", "UP", "DOWN"], dtype=object)  # Direction labels by code
+
+
+def _run_movement_direction(spec: ArraySpec) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Only the close goes in and only the new columns come back: Direction as int8 codes
+    into _DIRECTIONS, RunID and RunLength. The parent attaches them to the frame it holds.
+    """
+    out = movement_direction(pd.DataFrame({"Close": _attach_array(spec)}))
+    direction = out["Direction"].to_numpy()
+    codes = (direction == "UP").astype(np.int8) + 2 * (direction == "DOWN").astype(np.int8)
+    return codes, out["RunID"].to_numpy(), out["RunLength"].to_numpy()
+
+
+def _with_runs(df: pd.DataFrame, runs: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> pd.DataFrame:
+    """movement_direction(df) rebuilt from a worker's run columns."""
+    codes, run_id, run_len = runs
+    out = df.copy()
+    out["Direction"] = pd.Series(_DIRECTIONS[codes], index=out.index, dtype="object")
+    out["RunID"] = run_id
+    out["RunLength"] = run_len
+    return out
+
+
+def _run_max_profit(spec: ArraySpec):
+    return max_profit_trades(_attach_array(spec))
+
+
+# ---------- Public API ----------
+class AnalyticsBackend:
+    """
+    Runs src analytics in a persistent process pool, passing arrays through shared memory.
+
+    Every submit_* method returns a concurrent.futures.Future. With inprocess=True (or
+    STOCK_ANALYSIS_INPROCESS=1) the work runs immediately on the calling thread and the
+    returned Future is already resolved, so callers do not need a separate code path.
+    """
+
+    def __init__(self, max_workers: int | None = None, inprocess: bool | None = None) -> None:
+        if inprocess is None:
+            inprocess = os.environ.get(INPROCESS_ENV, "") == "1"
+        self.inprocess = inprocess
+        self.max_workers = max_workers
+        self._pool_lock = threading.Lock()
+        self._pool = None if inprocess else self._new_pool()
+
+    def submit_movement_direction(self, df: pd.DataFrame, *, close_col: str = "Close") -> Future:
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("df must be a pandas DataFrame")
+        if self._pool is None or close_col not in df.columns:  # in-process (a missing column raises on result())
+            return self._resolved(movement_direction, df, close_col=close_col)
+        segments: List[shared_memory.SharedMemory] = []
+        close = pd.to_numeric(df[close_col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        spec = _share_array(close, segments)
+        return _then(self._submit(segments, _run_movement_direction, spec), lambda runs: _with_runs(df, runs))
+
+    def submit_max_profit(self, prices) -> Future:
+        prices = np.asarray(prices, dtype=np.float64)
+        if self._pool is None:
+            return self._resolved(max_profit_trades, prices)
+        segments: List[shared_memory.SharedMemory] = []
+        spec = _share_array(prices, segments)
+        return self._submit(segments, _run_max_profit, spec)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    # ---------- internals ----------
+    @staticmethod
+    def _resolved(func: Callable, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(func(*args, **kwargs))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the caller (Streamlit) is multi-threaded
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        # Start every worker now: a pool only spawns while all its workers are busy, and these
+        # submits land before any worker is up, so later submits never spawn (see _worker_safe_main)
+        with _worker_safe_main():
+            started = [pool.submit(os.getpid) for _ in range(self.max_workers or os.cpu_count() or 1)]
+        for fut in started:
+            fut.result()
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a fresh pool, unless another thread already replaced `broken`."""
+        with self._pool_lock:
+            if self._pool is broken:
+                self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, segments: List[shared_memory.SharedMemory], func: Callable, *args) -> Future:
+        try:
+            fut = None
+            for _ in range(2):
+                pool = self._pool
+                try:
+                    fut = pool.submit(func, *args)
+                    break
+                except BrokenProcessPool:  # a worker died (OOM kill, crash): restart the pool and retry once
+                    self._replace_pool(pool)
+            if fut is None:  # still broken: run on this thread, reading the shared segments directly
+                fut = self._resolved(func, *args)
+        except Exception:
+            _release(segments)
+            raise
+        # The parent owns the segments: free them once the worker is done with them
+        fut.add_done_callback(lambda _: _release(segments))
+        return fut
+
+
+def _then(fut: Future, func: Callable) -> Future:
+    """Future resolving to func(fut.result()); exceptions pass through."""
+    out: Future = Future()
+
+    def _done(f: Future) -> None:
+        try:
+            out.set_result(func(f.result()))
+        except Exception as e:
+            out.set_exception(e)
+
+    fut.add_done_callback(_done)
+    return out
+
+
+def _release(segments: List[shared_memory.SharedMemory]) -> None:
+    for shm in segments:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import hashlib
+from typing import Tuple
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from src.resample import run_spans
+from src.streaks import require_columns
+
+__all__ = ["fingerprint", "close_sma_figure", "returns_figure", "runs_figure",
+           "trades_figure", "heatmap_figure", "lines_figure"]
+
+CACHE_SIZE = 64  # built figures kept per builder across reruns/sessions
+MARGIN = dict(l=10, r=10, t=30, b=10)
+DATE_AXIS = dict(type="date")  # x values are epoch ms (see _dates), not strings
+
+# Figures are shared across sessions by st.cache_resource, keyed on (fingerprint, params);
+# "_"-prefixed data arguments are left out of the key. Callers must treat them as
+# read-only (st.plotly_chart only serializes them).
+_figure_cache = st.cache_resource(max_entries=CACHE_SIZE, show_spinner=False)
+
+
+# ---------- Cache key ----------
+def fingerprint(*objs) -> str:
+    """
+    Content hash of Series/DataFrames/arrays (values and index), used as the data part
+    of a figure cache key. Hashes raw buffers, so it is O(n) but never goes through Python objects.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for obj in objs:
+        if isinstance(obj, (pd.Series, pd.DataFrame)):
+            index = obj.index
+            h.update(index.asi8.tobytes() if isinstance(index, pd.DatetimeIndex)
+                     else pd.util.hash_pandas_object(index).to_numpy().tobytes())
+            frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+            for col in frame.columns:
+                h.update(str(col).encode())
+                h.update(_numeric(frame[col]).tobytes())
+        else:
+            arr = np.ascontiguousarray(obj)
+            h.update(arr.dtype.str.encode())
+            h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _numeric(s: pd.Series) -> np.ndarray:
+    """float64 values so plotly sends them as a typed binary buffer (None -> NaN)."""
+    if pd.api.types.is_numeric_dtype(s):
+        return s.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.util.hash_pandas_object(s, index=False).to_numpy()
+
+
+def _values(s: pd.Series) -> np.ndarray:
+    return s.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _dates(index) -> np.ndarray:
+    """
+    Dates as float64 epoch milliseconds of the wall-clock time, so they go out as a binary
+    buffer instead of ISO strings. plotly.js ignores UTC offsets in date strings, so wall
+    time matches what it displayed before. Needs an x axis of type "date" (see DATE_AXIS).
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ms").asi8.astype(np.float64)
+
+
+# ---------- Tab 1 ----------
+def close_sma_figure(df: pd.DataFrame, window: int) -> go.Figure:
+    """Close and SMA lines; Daily Returns shown on hover (numeric, so a missing return reads NaN)."""
+    require_columns(df, ["Close", "SMA", "Daily Returns"])
+    return _close_sma_figure(fingerprint(df[["Close", "SMA", "Daily Returns"]]), window, df)
+
+
+@_figure_cache
+def _close_sma_figure(key: str, window: int, _df: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=_dates(_df.index), y=_values(_df["Close"]), mode="lines", name="Close",
+        customdata=_values(_df["Daily Returns"]),  # numeric, sent as binary
+        hovertemplate="Date:%{x|%Y-%m-%d}<br>Close:%{y:.2f}<br>Daily Return:%{customdata:.2f}<extra></extra>"))
+    fig.add_trace(go.Scatter(
+        x=_dates(_df.index), y=_values(_df["SMA"]), mode="lines", name=f"SMA{window}",
+        hovertemplate=f"Date=%{{x|%Y-%m-%d}}<br>SMA{window}=%{{y:.2f}}<extra></extra>"))
+    fig.update_layout(margin=MARGIN, legend_title=None, xaxis=DATE_AXIS)
+    return fig
+
+
+def returns_figure(df: pd.DataFrame) -> go.Figure:
+    """Daily Returns line (volatility)."""
+    require_columns(df, ["Daily Returns"])
+    return _returns_figure(fingerprint(df[["Daily Returns"]]), df)
+
+
+@_figure_cache
+def _returns_figure(key: str, _df: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Scatter(x=_dates(_df.index), y=_values(_df["Daily Returns"]), mode="lines",
+                               line_color="orange", name="Daily Returns"))
+    fig.update_layout(title="Daily Volatility", xaxis_title=_df.index.name or "Date",
+                      yaxis_title="Daily Returns", margin=dict(MARGIN, t=60), xaxis=DATE_AXIS)
+    return fig
+
+
+# ---------- Tab 2 ----------
+def runs_figure(bars: pd.DataFrame, level: str, annotations: Tuple[str, ...] = ()) -> go.Figure:
+    """
+    Candlestick of movement_direction() output with up/down runs shaded.
+    Runs become one filled trace per direction (rectangles separated by NaN gaps) rather
+    than one layout shape each. `annotations` are drawn above the chart, left to right.
+    """
+    require_columns(bars, ["Open", "High", "Low", "Close", "Direction", "RunID"])
+    return _runs_figure(fingerprint(bars[["Open", "High", "Low", "Close"]]), level, tuple(annotations), bars)
+
+
+@_figure_cache
+def _runs_figure(key: str, level: str, annotations: Tuple[str, ...], _bars: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Candlestick(
+        x=_dates(_bars.index), open=_values(_bars["Open"]), high=_values(_bars["High"]),
+        low=_values(_bars["Low"]), close=_values(_bars["Close"]),
+        increasing_line_color="green", decreasing_line_color="red", name=f"OHLC ({level})"))
+    spans = run_spans(_bars)
+    for d, colour in (("UP", "green"), ("DOWN", "red")):
+        sub = spans[spans["Direction"] == d]
+        n = len(sub)
+        xs = np.full(n * 6, np.nan)  # every 6th point stays NaN: gap between rectangles
+        ys = np.full(n * 6, np.nan)
+        for k, (col, y) in enumerate([("Start", 0), ("Start", 1), ("End", 1), ("End", 0), ("Start", 0)]):
+            xs[k::6] = _dates(sub[col])
+            ys[k::6] = y
+        fig.add_trace(go.Scatter(x=xs, y=ys, yaxis="y2", mode="none", fill="toself",
+                                 fillcolor=colour, opacity=0.08, hoverinfo="skip", showlegend=False))
+    fig.update_layout(yaxis2=dict(overlaying="y", range=[0, 1], visible=False, fixedrange=True))
+    for i, text in enumerate(annotations):
+        fig.add_annotation(xref="paper", yref="paper", x=0.01 + 0.39 * i, y=1.07,
+                           showarrow=False, align="left", text=text)
+    fig.update_layout(margin=dict(MARGIN, t=60), legend_title=None, xaxis=DATE_AXIS)
+    return fig
+
+
+# ---------- Tab 3 ----------
+def trades_figure(close: pd.Series, trades: np.ndarray) -> go.Figure:
+    """Close line with buy/sell markers from a max_profit_trades() structured array."""
+    return _trades_figure(fingerprint(close, trades), close, trades)
+
+
+@_figure_cache
+def _trades_figure(key: str, _close: pd.Series, _trades: np.ndarray) -> go.Figure:
+    dates = _dates(_close.index)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=_values(_close), mode="lines", name="Close"))
+    fig.add_trace(go.Scatter(
+        x=dates[_trades["buy_day"]], y=_trades["buy_price"], mode="markers", name="Buy",
+        marker=dict(symbol="triangle-up", size=10, color="green"),
+        hovertemplate="Buy<br>Date=%{x|%Y-%m-%d}<br>Price=%{y:.2f}<extra></extra>"))
+    fig.add_trace(go.Scatter(
+        x=dates[_trades["sell_day"]], y=_trades["sell_price"], mode="markers", name="Sell",
+        marker=dict(symbol="triangle-down", size=10, color="red"),
+        customdata=_trades["sell_price"] - _trades["buy_price"],
+        hovertemplate="Sell<br>Date=%{x|%Y-%m-%d}<br>Price=%{y:.2f}<br>Trade P/L=%{customdata:.2f}<extra></extra>"))
+    fig.update_layout(margin=MARGIN, legend_title=None, xaxis=DATE_AXIS)
+    return fig
+
+
+# ---------- Tab 4 ----------
+def heatmap_figure(matrix: pd.DataFrame, *, zmin: float, zmax: float, colorscale: str,
+                   label: str, fmt: str = ".2f", reversescale: bool = False) -> go.Figure:
+    """Square ticker x ticker heatmap (correlation / co-occurrence)."""
+    return _heatmap_figure(fingerprint(matrix), zmin, zmax, colorscale, label, fmt, reversescale, matrix)
+
+
+@_figure_cache
+def _heatmap_figure(key: str, zmin: float, zmax: float, colorscale: str, label: str, fmt: str,
+                    reversescale: bool, _matrix: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Heatmap(
+        z=_matrix.to_numpy(dtype=np.float64), x=list(_matrix.columns), y=list(_matrix.index),
+        zmin=zmin, zmax=zmax, colorscale=colorscale, reversescale=reversescale,
+        hovertemplate=f"%{{y}} vs %{{x}}<br>{label}=%{{z:{fmt}}}<extra></extra>"))
+    fig.update_layout(margin=MARGIN)
+    return fig
+
+
+def lines_figure(frame: pd.DataFrame, *, yrange: Tuple[float, float] | None = None) -> go.Figure:
+    """One line per column over a shared date index (rolling correlations)."""
+    return _lines_figure(fingerprint(frame), None if yrange is None else tuple(yrange), frame)
+
+
+@_figure_cache
+def _lines_figure(key: str, yrange: Tuple[float, float] | None, _frame: pd.DataFrame) -> go.Figure:
+    fig = go.Figure([go.Scatter(x=_dates(_frame.index), y=_values(_frame[c]), mode="lines", name=str(c))
+                     for c in _frame.columns])
+    fig.update_layout(margin=MARGIN, legend_title=None, xaxis=DATE_AXIS)
+    if yrange is not None:
+        fig.update_layout(yaxis_range=list(yrange))
+    return fig
@@ -1,7 +1,16 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Columnar trade record: one row per buy/sell pair, fields addressable as whole arrays
+TRADE_DTYPE = np.dtype([
+    ("buy_day", np.int64),
+    ("sell_day", np.int64),
+    ("buy_price", np.float64),
+    ("sell_price", np.float64),
+])
+
 # --- max profit function ---
 def max_profit_with_days(prices):
     """
@@ -47,6 +56,33 @@ def max_profit_with_days(prices):
 
     return profit, transactions
 
+# --- columnar (vectorised) max profit ---
+def max_profit_trades(prices):
+    """
+    Same trades as max_profit_with_days, computed with NumPy on an array input.
+    Returns (total_profit, trades) where trades is a structured array of TRADE_DTYPE.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.size < 2: #no comparison possible with fewer than 2 days
+        return 0.0, np.empty(0, dtype=TRADE_DTYPE)
+
+    delta = np.diff(prices) #delta[k] = move from day k to day k+1
+
+    # Holding over move k: True on a rise, False on a fall, and a flat move keeps the previous state
+    # (flats never trigger a buy, and never force a sell while holding)
+    last_move = np.maximum.accumulate(np.where(delta != 0, np.arange(delta.size), 0))
+    holding = delta[last_move] > 0
+
+    edges = np.diff(np.concatenate(([0], holding.astype(np.int8), [0])))
+    trades = np.empty(np.count_nonzero(edges == 1), dtype=TRADE_DTYPE)
+    trades["buy_day"] = np.flatnonzero(edges == 1) #first move of a holding run -> buy at its start
+    trades["sell_day"] = np.flatnonzero(edges == -1) #one past the last move -> sell at its end
+    trades["buy_price"] = prices[trades["buy_day"]]
+    trades["sell_price"] = prices[trades["sell_day"]]
+
+    profit = float((trades["sell_price"] - trades["buy_price"]).sum())
+    return profit, trades
+
 # --- fetch prices from yfinance ---
 def fetch_prices_for_algo(ticker, start, end_inclusive, interval='1d'):#Creates a function that takes a stock symbol, start date, end date, and time interval
     end_dt = datetime.strptime(end_inclusive, "%Y-%m-%d") + timedelta(days=1) #Adds 1 day to the end date because Yahoo Finance's end parameter is exclusive
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from src.streaks import require_columns
+
+__all__ = ["build_pyramid", "choose_resolution", "run_spans"]
+
+# Resolution label -> pandas resample rule, finest to coarsest.
+# Every bucket is closed/labelled on its left edge so a candle sits at the
+# start of the period it covers.
+RESOLUTIONS: Dict[str, str] = {
+    "1h": "1h",
+    "1D": "1D",
+    "1W": "W-MON",
+    "1M": "MS",
+}
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+# ---------- Helpers ----------
+def _bar_width(index: pd.Index) -> pd.Timedelta:
+    """Typical spacing between consecutive bars (median, robust to gaps/weekends)."""
+    if len(index) < 2:
+        return pd.Timedelta(days=1)
+    return pd.Series(index).diff().median()
+
+
+def aggregate_ohlc(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    Resample OHLC(V) bars to a coarser rule.
+    Buckets with no trading (weekends, holidays) are dropped.
+    """
+    require_columns(df, ["Open", "High", "Low", "Close"])
+    agg = {c: f for c, f in OHLCV_AGG.items() if c in df.columns}
+    out = df[list(agg)].resample(rule, closed="left", label="left").agg(agg)
+    return out.dropna(subset=["Close"])
+
+
+# ---------- Public API ----------
+def build_pyramid(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Precompute OHLCV aggregates at every resolution coarser than (or equal to) the input.
+
+    Returns an ordered dict {label: DataFrame}, finest first. Daily, weekly and
+    monthly levels are always present; the hourly level only for intraday input.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("df must be a pandas DataFrame")
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise TypeError("df must have a DatetimeIndex")
+
+    intraday = _bar_width(df.index) < pd.Timedelta(days=1)
+    pyramid: Dict[str, pd.DataFrame] = {}
+    for label, rule in RESOLUTIONS.items():
+        if label == "1h" and not intraday:
+            continue
+        if label == "1D" and not intraday:
+            pyramid[label] = df  # native daily bars, nothing to aggregate
+        else:
+            pyramid[label] = aggregate_ohlc(df, rule)
+    return pyramid
+
+
+def choose_resolution(pyramid: Dict[str, pd.DataFrame], min_bars: int = 100) -> str:
+    """
+    Pick the coarsest level that still has at least `min_bars` bars (enough to fill
+    the chart width). Falls back to the finest level for short histories.
+    """
+    if not pyramid:
+        raise ValueError("pyramid is empty")
+    labels = list(pyramid)
+    for label in reversed(labels):
+        if len(pyramid[label]) >= min_bars:
+            return label
+    return labels[0]
+
+
+def run_spans(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse movement_direction() output into one row per run.
+    Columns: Start, End, Direction. End is the last bar of the run plus one bar width,
+    so consecutive spans tile the chart without gaps.
+    """
+    require_columns(df, ["Direction", "RunID"])
+
+    mask = df["RunID"].to_numpy() > 0
+    if not mask.any():
+        return pd.DataFrame({"Start": pd.Series(dtype=df.index.dtype),
+                             "End": pd.Series(dtype=df.index.dtype),
+                             "Direction": pd.Series(dtype="object")})
+
+    run_ids = df["RunID"].to_numpy()[mask]
+    index = df.index[mask]
+    direction = df["Direction"].to_numpy()[mask]
+
+    # Rows of a run are contiguous, so run boundaries are where RunID changes
+    first = np.flatnonzero(np.r_[True, run_ids[1:] != run_ids[:-1]])
+    last = np.r_[first[1:] - 1, len(run_ids) - 1]
+
+    return pd.DataFrame({
+        "Start": index[first],
+        "End": index[last] + _bar_width(df.index),
+        "Direction": direction[first],
+    })
@@ -0,0 +1,239 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+__all__ = ["BarStore", "STORE_ENV"]
+
+# Directory of the shared bar store; unset -> dashboard fetches straight from yfinance
+STORE_ENV = "STOCK_ANALYSIS_STORE"
+
+PRICE_FIELDS = ("Open", "High", "Low", "Close", "Adj Close")
+INT_FIELDS = ("Volume",)
+TIME_FIELD = "__timestamp__"  # int64 UTC epoch in the index's unit
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"  # names the published version directory of a ticker
+LOCK_FILE = ".lock"
+KEEP_VERSIONS = 2  # published + previous, so readers that just resolved the old one can still load it
+
+
+# ---------- Helpers ----------
+def period_start(last: pd.Timestamp, period: str) -> pd.Timestamp | None:
+    """
+    First timestamp covered by a yfinance-style period ("5d", "1wk", "3mo", "1y", "ytd", "max")
+    counted back from `last`. None means the whole history.
+    """
+    p = period.strip().lower()
+    if p == "max":
+        return None
+    if p == "ytd":
+        return last.normalize().replace(month=1, day=1)
+    for suffix, unit in (("mo", "months"), ("wk", "weeks"), ("d", "days"), ("y", "years")):
+        if p.endswith(suffix) and p[:-len(suffix)].isdigit():
+            return last - pd.DateOffset(**{unit: int(p[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _field_dtype(col: str, price_dtype: np.dtype) -> np.dtype:
+    if col in PRICE_FIELDS:
+        return price_dtype
+    if col in INT_FIELDS:
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+@contextmanager
+def _exclusive(path: str):
+    """Exclusive lock on `path` (created if missing), across threads and processes."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ---------- Public API ----------
+class BarStore:
+    """
+    On-disk columnar OHLCV store: one fixed-dtype .npy file per (ticker, field).
+
+    Layout: <root>/<TICKER>/<version>/<field>.npy plus meta.json (column order, dtypes,
+    timezone, write time). A version directory is never modified after it is written;
+    <TICKER>/CURRENT names the published one and is replaced atomically, so a reader
+    resolves one version and reads a consistent set of files from it. Writers of the
+    same ticker are serialised by a lock file. open() memory-maps every file read-only,
+    so any number of processes reading the same ticker share one copy of the data
+    through the OS page cache.
+    """
+
+    def __init__(self, root: str, *, price_dtype: str = "float64", max_age: float = 24 * 3600) -> None:
+        self.root = root
+        self.price_dtype = np.dtype(price_dtype)
+        if self.price_dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError("price_dtype must be float32 or float64")
+        self.max_age = max_age  # seconds before a ticker is considered stale
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def _resolve(self, ticker: str) -> Tuple[str, dict] | None:
+        """(version directory, meta) of the published version, or None if there is none."""
+        tdir = self._dir(ticker)
+        version = None
+        while True:
+            try:
+                with open(os.path.join(tdir, CURRENT_FILE)) as f:
+                    latest = f.read().strip()
+            except FileNotFoundError:
+                return None
+            if latest == version:  # published version itself is missing
+                return None
+            version = latest
+            vdir = os.path.join(tdir, version)
+            try:
+                with open(os.path.join(vdir, META_FILE)) as f:
+                    return vdir, json.load(f)
+            except FileNotFoundError:  # pruned by later writes since CURRENT was read: follow it again
+                continue
+
+    def tickers(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, d, CURRENT_FILE)))
+
+    def __contains__(self, ticker: str) -> bool:
+        return self._resolve(ticker) is not None
+
+    def covers(self, ticker: str, period: str) -> bool:
+        """True if the stored history is fresh and was fetched for at least `period`."""
+        resolved = self._resolve(ticker)
+        if resolved is None:
+            return False
+        vdir, meta = resolved
+        if meta["rows"] == 0 or time.time() - meta["written"] > self.max_age:
+            return False
+        try:
+            last = self._timestamps(self._load(vdir, TIME_FIELD)[-1:], meta)[0]
+        except FileNotFoundError:  # version pruned since it was resolved
+            return False
+        wanted, stored = period_start(last, period), period_start(last, meta["period"])
+        if stored is None:
+            return True
+        return wanted is not None and wanted >= stored
+
+    def write(self, ticker: str, df: pd.DataFrame, *, period: str = "max") -> None:
+        """
+        Store a dataset()-style frame (DatetimeIndex, numeric columns) fetched for `period`.
+        Non-numeric columns are skipped. The frame goes into a new version directory that
+        is published by replacing CURRENT, then versions older than KEEP_VERSIONS are removed.
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError("df must have a DatetimeIndex")
+
+        tdir = self._dir(ticker)
+        os.makedirs(tdir, exist_ok=True)
+        with _exclusive(os.path.join(tdir, LOCK_FILE)):
+            version = f"v{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"  # sorts by write order
+            vdir = os.path.join(tdir, version)
+            os.mkdir(vdir)
+            try:
+                columns: Dict[str, str] = {}
+                for col in df.columns:
+                    if not pd.api.types.is_numeric_dtype(df[col]):
+                        continue
+                    dtype = _field_dtype(col, self.price_dtype)
+                    values = df[col].to_numpy()
+                    if dtype.kind == "i":
+                        values = np.nan_to_num(values.astype(np.float64)).astype(dtype)
+                    np.save(os.path.join(vdir, f"{col}.npy"), np.ascontiguousarray(values, dtype=dtype))
+                    columns[col] = dtype.str
+                np.save(os.path.join(vdir, f"{TIME_FIELD}.npy"), df.index.asi8.astype(np.int64))
+                meta = {
+                    "columns": columns,
+                    "rows": len(df),
+                    "unit": df.index.unit,
+                    "tz": str(df.index.tz) if df.index.tz is not None else None,
+                    "index_name": df.index.name,
+                    "period": period,
+                    "written": time.time(),
+                }
+                with open(os.path.join(vdir, META_FILE), "w") as f:
+                    json.dump(meta, f)
+
+                pointer = os.path.join(tdir, f".{CURRENT_FILE}-{version}")
+                with open(pointer, "w") as f:
+                    f.write(version)
+                os.replace(pointer, os.path.join(tdir, CURRENT_FILE))  # the single publishing step
+            except Exception:
+                shutil.rmtree(vdir, ignore_errors=True)
+                raise
+            self._prune(tdir, version)
+
+    @staticmethod
+    def _prune(tdir: str, current: str) -> None:
+        """Drop old and abandoned versions (caller holds the ticker lock, so none is being written)."""
+        versions = sorted(d for d in os.listdir(tdir) if d.startswith("v"))
+        keep = [d for d in versions if d <= current][-KEEP_VERSIONS:]
+        for d in versions:
+            if d not in keep:
+                shutil.rmtree(os.path.join(tdir, d), ignore_errors=True)  # open memmaps stay valid after unlink
+
+    @staticmethod
+    def _load(vdir: str, field: str) -> np.memmap:
+        return np.load(os.path.join(vdir, f"{field}.npy"), mmap_mode="r")
+
+    @staticmethod
+    def _timestamps(stamps: np.ndarray, meta: dict) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(stamps.view(f"M8[{meta['unit']}]"), name=meta["index_name"])
+        if meta["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        return index
+
+    def open(self, ticker: str, period: str = "max") -> pd.DataFrame:
+        """
+        Memory-mapped view of a stored ticker, shaped like dataset()'s frame.
+        Columns are read-only views on the files (no copy); `period` trims the history
+        from the end, yfinance-style. All files come from the one version resolved up front.
+        """
+        for attempt in range(2):
+            resolved = self._resolve(ticker)
+            if resolved is None:
+                raise KeyError(f"Ticker not in store: {ticker}")
+            vdir, meta = resolved
+            try:
+                stamps = self._load(vdir, TIME_FIELD)
+                data = {col: self._load(vdir, col) for col in meta["columns"]}
+                break
+            except FileNotFoundError:  # pruned by later writes since it was resolved: resolve again
+                if attempt:
+                    raise
+
+        lo = 0
+        if meta["rows"]:
+            start = period_start(self._timestamps(stamps[-1:], meta)[0], period)
+            if start is not None:
+                lo = int(np.searchsorted(stamps, start.as_unit(meta["unit"]).asm8.view("i8"), side="left"))
+
+        return pd.DataFrame({col: values[lo:] for col, values in data.items()},
+                            index=self._timestamps(stamps[lo:], meta), copy=False)
@@ -1,3 +1,24 @@
 # tests/conftest.py
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+
+def ohlc_frame(closes, *, start="2025-01-01", freq="D", tz=None, name=None,
+               columns=PRICE_COLUMNS, volume=None):
+    """
+    Price frame built from a close series, shared by the test modules.
+    Open = Close, High/Low = Close +/- 1 on a date_range index; `columns` picks which of
+    PRICE_COLUMNS to keep and `volume` (scalar or array) adds a Volume column.
+    """
+    idx = pd.date_range(start=start, periods=len(closes), freq=freq, tz=tz, name=name)
+    close = np.asarray(closes, dtype=float)
+    prices = {"Open": close, "High": close + 1, "Low": close - 1, "Close": close}
+    df = pd.DataFrame({col: prices[col] for col in columns}, index=idx)
+    if volume is not None:
+        df["Volume"] = volume
+    return df
@@ -0,0 +1,111 @@
+# tests/test_correlation.py
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from src.streaks import movement_direction
+from src.correlation import (align_closes, correlation_matrix, rolling_correlation,
+                             streak_cooccurrence, co_movement, rolling_correlation_frame)
+from conftest import ohlc_frame
+
+def random_closes(T=120, N=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + 0.01 * rng.standard_normal((T, N)), axis=0)
+
+
+# ---------- alignment ----------
+def test_align_keeps_only_common_dates():
+    a = ohlc_frame([1, 2, 3, 4], columns=("Close",))
+    b = ohlc_frame([5, 6, 7], start="2025-01-02", columns=("Close",))
+    out = align_closes({"A": a, "B": b})
+    assert list(out.columns) == ["A", "B"]
+    assert len(out) == 3
+    assert out.index[0] == pd.Timestamp("2025-01-02")
+
+def test_align_drops_timezone_to_calendar_dates():
+    a = ohlc_frame([1, 2], tz="America/New_York", columns=("Close",))
+    b = ohlc_frame([3, 4], columns=("Close",))
+    assert len(align_closes({"A": a, "B": b})) == 2
+
+def test_align_missing_close_raises_keyerror():
+    with pytest.raises(KeyError):
+        align_closes({"A": pd.DataFrame({"Open": [1.0]})})
+
+
+# ---------- correlation ----------
+def test_correlation_matches_numpy_corrcoef():
+    rets = np.diff(random_closes(), axis=0)
+    assert np.allclose(correlation_matrix(rets), np.corrcoef(rets.T))
+
+def test_correlation_constant_column_is_nan():
+    rets = np.column_stack([np.arange(5.0), np.zeros(5)])
+    corr = correlation_matrix(rets)
+    assert np.isnan(corr[1]).all() and corr[0, 0] == pytest.approx(1.0)
+
+def test_rolling_correlation_matches_pandas():
+    rets = np.diff(random_closes(), axis=0)
+    out = rolling_correlation(rets, window=20, ref=1)
+    expected = pd.DataFrame(rets).rolling(20).corr(pd.Series(rets[:, 1])).to_numpy()
+    assert np.isnan(out[:19]).all()
+    assert np.allclose(out[19:], expected[19:])
+
+def test_correlation_skips_missing_rows_pairwise():
+    rets = np.diff(random_closes(), axis=0)
+    rets[5, 0] = np.nan
+    assert np.allclose(correlation_matrix(rets), pd.DataFrame(rets).corr().to_numpy())
+
+def test_zero_close_only_blanks_windows_that_contain_it():
+    closes = random_closes(T=80, N=3)
+    closes[30, 2] = 0.0  # inf return into the zero, then NaN out of it
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        rets = co_movement(pd.DataFrame(closes))["returns"].to_numpy()
+        out = rolling_correlation(rets, window=10, ref=0)
+    expected = pd.DataFrame(rets).rolling(10).corr(pd.Series(rets[:, 0])).to_numpy()
+    assert np.array_equal(np.isnan(out), np.isnan(expected))
+    assert np.allclose(out[-20:], expected[-20:])
+
+def test_rolling_window_longer_than_history_is_all_nan():
+    assert np.isnan(rolling_correlation(np.ones((5, 2)), window=10)).all()
+
+
+# ---------- streak co-occurrence ----------
+def test_cooccurrence_matches_movement_direction():
+    closes = random_closes(T=40, N=3)
+    dirs = [movement_direction(ohlc_frame(closes[:, j], columns=("Close",)))["Direction"].to_numpy()[1:] for j in range(3)]
+    co = streak_cooccurrence(closes)
+    for i in range(3):
+        for j in range(3):
+            both = (dirs[i] != "FLAT") & (dirs[j] != "FLAT")
+            assert co[i, j] == pytest.approx((dirs[i][both] == dirs[j][both]).mean())
+
+def test_cooccurrence_opposite_moves_is_zero():
+    closes = np.column_stack([[1, 2, 1, 2], [2, 1, 2, 1]]).astype(float)
+    co = streak_cooccurrence(closes)
+    assert co[0, 1] == 0 and co[0, 0] == 1
+
+def test_cooccurrence_never_in_run_together_is_nan():
+    closes = np.column_stack([[1, 1, 1], [1, 2, 3]]).astype(float)
+    assert np.isnan(streak_cooccurrence(closes)[0, 1])
+
+
+# ---------- bundle ----------
+def test_co_movement_labels_and_shapes():
+    closes = pd.DataFrame(random_closes(T=50, N=3), columns=["A", "B", "C"],
+                          index=pd.date_range("2025-01-01", periods=50))
+    out = co_movement(closes)
+    assert out["correlation"].shape == (3, 3)
+    assert list(out["cooccurrence"].index) == ["A", "B", "C"]
+    assert out["returns"].shape == (49, 3)
+
+def test_rolling_frame_is_labelled_against_reference():
+    closes = pd.DataFrame(random_closes(T=50, N=3), columns=["A", "B", "C"],
+                          index=pd.date_range("2025-01-01", periods=50))
+    rolling = rolling_correlation_frame(co_movement(closes)["returns"], window=10, ref="B")
+    assert rolling.shape == (49, 3)
+    assert np.allclose(rolling["B"].dropna(), 1.0)
+
+def test_rolling_frame_unknown_reference_raises_keyerror():
+    returns = pd.DataFrame(np.diff(random_closes(T=20, N=2), axis=0), columns=["A", "B"])
+    with pytest.raises(KeyError):
+        rolling_correlation_frame(returns, ref="Z")
@@ -0,0 +1,131 @@
+# tests/test_executor.py
+import sys
+import time
+import types
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import pytest
+from src.executor import (AnalyticsBackend, INPROCESS_ENV, _release, _run_movement_direction, _share_array,
+                          _worker_safe_main)
+from src.max_profit import max_profit_trades
+from src.streaks import movement_direction
+from conftest import ohlc_frame
+
+CLOSES = [1, 2, 3, 3, 2, 1, 2, 5, 4, 4, 6]
+
+def closes_frame():
+    return ohlc_frame(CLOSES, tz="America/New_York", name="Date", volume=np.arange(len(CLOSES)))
+
+
+@pytest.fixture(scope="module")
+def pool_backend():
+    backend = AnalyticsBackend(max_workers=1, inprocess=False)
+    yield backend
+    backend.shutdown()
+
+
+# ---------- switch ----------
+def test_env_var_selects_inprocess(monkeypatch):
+    monkeypatch.setenv(INPROCESS_ENV, "1")
+    assert AnalyticsBackend().inprocess
+
+def test_inprocess_future_is_already_resolved():
+    backend = AnalyticsBackend(inprocess=True)
+    fut = backend.submit_max_profit(CLOSES)
+    assert fut.done()
+
+
+# ---------- results match direct calls ----------
+@pytest.mark.parametrize("inprocess", [True, False])
+def test_movement_direction_matches_direct_call(inprocess, pool_backend):
+    backend = AnalyticsBackend(inprocess=True) if inprocess else pool_backend
+    df = closes_frame()
+    out = backend.submit_movement_direction(df).result()
+    pd.testing.assert_frame_equal(out, movement_direction(df), check_freq=False)
+
+@pytest.mark.parametrize("inprocess", [True, False])
+def test_max_profit_matches_direct_call(inprocess, pool_backend):
+    backend = AnalyticsBackend(inprocess=True) if inprocess else pool_backend
+    profit, trades = backend.submit_max_profit(np.array(CLOSES, dtype=float)).result()
+    exp_profit, exp_trades = max_profit_trades(CLOSES)
+    assert profit == exp_profit
+    assert np.array_equal(trades, exp_trades)
+
+def test_object_columns_survive_transfer(pool_backend):
+    df = closes_frame()
+    df["Label"] = ["x"] * len(df)
+    out = pool_backend.submit_movement_direction(df).result()
+    assert (out["Label"] == "x").all()
+
+
+def test_worker_returns_only_run_columns():
+    segments = []
+    try:
+        runs = _run_movement_direction(_share_array(np.array(CLOSES, dtype=float), segments))
+    finally:
+        _release(segments)
+    codes, run_id, run_len = runs
+    assert codes.dtype == np.int8 and len(codes) == len(CLOSES)
+    expected = movement_direction(closes_frame())
+    assert np.array_equal(run_id, expected["RunID"]) and np.array_equal(run_len, expected["RunLength"])
+
+
+# ---------- errors ----------
+@pytest.mark.parametrize("inprocess", [True, False])
+def test_worker_errors_surface_on_result(inprocess, pool_backend):
+    backend = AnalyticsBackend(inprocess=True) if inprocess else pool_backend
+    fut = backend.submit_movement_direction(closes_frame()[["Open"]])
+    with pytest.raises(KeyError):
+        fut.result()
+
+
+# ---------- worker start-up ----------
+def test_all_workers_start_with_the_pool():
+    backend = AnalyticsBackend(max_workers=2, inprocess=False)
+    try:
+        assert len(backend._pool._processes) == 2
+    finally:
+        backend.shutdown()
+
+def test_main_set_by_another_session_is_not_overwritten():
+    original = sys.modules["__main__"]
+    newer = types.ModuleType("__main__")
+    try:
+        with _worker_safe_main():
+            sys.modules["__main__"] = newer  # e.g. Streamlit starting another session's run
+        assert sys.modules["__main__"] is newer
+    finally:
+        sys.modules["__main__"] = original
+
+
+# ---------- broken pool ----------
+def test_pool_is_rebuilt_after_a_worker_dies():
+    backend = AnalyticsBackend(max_workers=1, inprocess=False)
+    try:
+        backend.submit_max_profit(CLOSES).result()  # start the worker
+        broken = backend._pool
+        for proc in list(broken._processes.values()):
+            proc.kill()
+            proc.join()
+        deadline = time.time() + 10
+        while not broken._broken and time.time() < deadline:
+            time.sleep(0.05)
+        profit, _ = backend.submit_max_profit(CLOSES).result()
+        assert profit == max_profit_trades(CLOSES)[0]
+        assert backend._pool is not broken
+    finally:
+        backend.shutdown()
+
+def test_falls_back_inprocess_when_pool_stays_broken(monkeypatch):
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+        def shutdown(self, *args, **kwargs):
+            pass
+    backend = AnalyticsBackend(inprocess=True)
+    monkeypatch.setattr(backend, "_new_pool", BrokenPool)
+    backend._pool = BrokenPool()
+    df = closes_frame()
+    out = backend.submit_movement_direction(df).result()
+    pd.testing.assert_frame_equal(out, movement_direction(df), check_freq=False)
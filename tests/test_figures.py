@@ -0,0 +1,80 @@
+# tests/test_figures.py
+import json
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from src.indicator import calculate_sma, daily_returns
+from src.max_profit import max_profit_trades
+from src.streaks import movement_direction
+from src.figures import (fingerprint, close_sma_figure, runs_figure, trades_figure,
+                         heatmap_figure)
+from conftest import ohlc_frame
+
+MARKET_DAYS = dict(freq="B", tz="America/New_York", name="Date")
+
+CLOSES = [10, 11, 12, 11, 10, 10, 12, 13, 12, 14]
+
+def _tab1_df(vals=CLOSES, window=3):
+    return daily_returns(calculate_sma(ohlc_frame(vals, **MARKET_DAYS), window=window))
+
+
+# ---------- fingerprint ----------
+def test_fingerprint_is_stable_and_content_sensitive():
+    a, b = _tab1_df(), _tab1_df()
+    assert fingerprint(a) == fingerprint(b)
+    b.iloc[-1, b.columns.get_loc("Close")] += 1
+    assert fingerprint(a) != fingerprint(b)
+
+def test_fingerprint_sees_index_changes():
+    a = _tab1_df()
+    b = a.copy()
+    b.index = b.index + pd.Timedelta(days=1)
+    assert fingerprint(a) != fingerprint(b)
+
+
+# ---------- cache ----------
+def test_same_data_and_params_reuse_figure():
+    assert close_sma_figure(_tab1_df(), 3) is close_sma_figure(_tab1_df(), 3)
+
+def test_different_params_build_new_figure():
+    df = _tab1_df()
+    assert close_sma_figure(df, 3) is not close_sma_figure(df, 4)
+
+
+# ---------- payload ----------
+def test_arrays_are_sent_as_typed_buffers():
+    spec = json.loads(pio.to_json(close_sma_figure(_tab1_df(), 3)))
+    close = spec["data"][0]
+    for attr in ("x", "y", "customdata"):
+        assert isinstance(close[attr], dict) and close[attr]["dtype"] == "f8", attr
+    assert spec["layout"]["xaxis"]["type"] == "date"
+
+def test_hover_returns_stay_numeric_with_nan():
+    fig = close_sma_figure(_tab1_df(), 3)
+    custom = fig.data[0].customdata
+    assert custom.dtype == np.float64 and np.isnan(custom[0])
+
+def test_dates_are_wall_clock_milliseconds():
+    fig = close_sma_figure(_tab1_df(), 3)
+    assert fig.data[0].x[0] == pd.Timestamp("2025-01-01").value / 1e6
+
+
+# ---------- builders ----------
+def test_runs_figure_has_one_shading_trace_per_direction():
+    bars = movement_direction(ohlc_frame(CLOSES, **MARKET_DAYS))
+    fig = runs_figure(bars, "1D", ("a", "b"))
+    assert [t.type for t in fig.data] == ["candlestick", "scatter", "scatter"]
+    assert fig.layout.shapes == ()
+    assert len(fig.layout.annotations) == 2
+
+def test_trades_figure_markers_match_trades():
+    df = ohlc_frame(CLOSES, **MARKET_DAYS)
+    _, trades = max_profit_trades(df["Close"].to_numpy())
+    fig = trades_figure(df["Close"], trades)
+    assert np.array_equal(fig.data[1].y, trades["buy_price"])
+    assert np.array_equal(fig.data[2].customdata, trades["sell_price"] - trades["buy_price"])
+
+def test_heatmap_figure_keeps_labels():
+    m = pd.DataFrame(np.eye(2), index=["A", "B"], columns=["A", "B"])
+    fig = heatmap_figure(m, zmin=-1, zmax=1, colorscale="RdBu", label="Correlation")
+    assert list(fig.data[0].x) == ["A", "B"]
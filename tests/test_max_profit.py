@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from src.max_profit import max_profit_with_days
+from src.max_profit import max_profit_with_days, max_profit_trades, TRADE_DTYPE
 import yfinance as yf
 
 def run_validations():
@@ -21,5 +22,31 @@ def run_validations():
         print(f"{desc:25} | Prices: {prices} | Expected: {expected} | {result}")
 
 
+# ---------- columnar result ----------
+VALIDATION_PRICES = [
+    [7,1,5,3,6,4], [1,2,3,4,5], [5,4,3,2,1], [2,2,2,2],
+    [1,3,2,8,4,9], [], [5], [1,1,2,2,1,1,3,3,3,2], [3,1,1,2,2,5,5,4],
+]
+
+def test_trades_match_list_of_tuples():
+    for prices in VALIDATION_PRICES:
+        profit, transactions = max_profit_with_days(prices)
+        col_profit, trades = max_profit_trades(np.array(prices, dtype=float))
+        assert col_profit == profit
+        assert trades.tolist() == transactions
+
+def test_trades_have_trade_dtype_when_empty():
+    profit, trades = max_profit_trades(np.array([5.0, 4.0, 3.0]))
+    assert profit == 0
+    assert trades.dtype == TRADE_DTYPE and len(trades) == 0
+
+def test_trade_columns_index_into_prices():
+    prices = np.array([1.0, 3.0, 2.0, 8.0, 4.0, 9.0])
+    _, trades = max_profit_trades(prices)
+    assert np.array_equal(prices[trades["buy_day"]], trades["buy_price"])
+    assert np.array_equal(prices[trades["sell_day"]], trades["sell_price"])
+    assert (trades["sell_day"] > trades["buy_day"]).all()
+
+
 if __name__ == "__main__":
     run_validations()
@@ -0,0 +1,65 @@
+# tests/test_resample.py
+import pandas as pd
+import pytest
+from src.streaks import movement_direction
+from src.resample import build_pyramid, choose_resolution, run_spans
+from conftest import ohlc_frame
+
+WEEKDAYS = dict(start="2025-01-06", freq="B", volume=1.0)  # starts on a Monday
+
+
+# ---------- pyramid ----------
+def test_non_datetime_index_raises_typeerror():
+    df = pd.DataFrame({"Open": [1], "High": [1], "Low": [1], "Close": [1]})
+    with pytest.raises(TypeError):
+        build_pyramid(df)
+
+def test_daily_input_builds_daily_weekly_monthly():
+    df = ohlc_frame(range(60), **WEEKDAYS)
+    pyramid = build_pyramid(df)
+    assert list(pyramid) == ["1D", "1W", "1M"]
+    assert pyramid["1D"] is df
+
+def test_intraday_input_adds_hourly_level():
+    df = ohlc_frame(range(48), start="2025-01-06 09:00", freq="15min", volume=1.0)
+    pyramid = build_pyramid(df)
+    assert list(pyramid) == ["1h", "1D", "1W", "1M"]
+    assert len(pyramid["1h"]) == 12
+
+def test_weekly_bars_aggregate_ohlcv():
+    df = ohlc_frame([1, 5, 3, 2, 4, 6, 7, 8, 9, 10], **WEEKDAYS)  # two Mon-Fri weeks
+    week = build_pyramid(df)["1W"]
+    assert len(week) == 2
+    first = week.iloc[0]
+    assert first["Open"] == 1 and first["Close"] == 4
+    assert first["High"] == 6 and first["Low"] == 0
+    assert first["Volume"] == 5
+
+
+# ---------- resolution choice ----------
+def test_choose_resolution_picks_coarsest_that_fills_chart():
+    pyramid = build_pyramid(ohlc_frame(range(600), **WEEKDAYS))
+    assert choose_resolution(pyramid, min_bars=100) == "1W"
+    assert choose_resolution(pyramid, min_bars=200) == "1D"
+
+def test_choose_resolution_falls_back_to_finest_for_short_history():
+    pyramid = build_pyramid(ohlc_frame(range(10), **WEEKDAYS))
+    assert choose_resolution(pyramid, min_bars=100) == "1D"
+
+
+# ---------- run spans ----------
+def test_run_spans_one_row_per_run():
+    out = movement_direction(ohlc_frame([1, 2, 3, 3, 2, 1, 2], **WEEKDAYS))
+    spans = run_spans(out)
+    assert spans["Direction"].tolist() == ["UP", "DOWN", "UP"]
+    assert len(spans) == out.loc[out["RunID"] > 0, "RunID"].nunique()
+
+def test_run_spans_end_one_bar_after_last_row():
+    out = movement_direction(ohlc_frame([1, 2, 3], **WEEKDAYS))
+    spans = run_spans(out)
+    assert spans.loc[0, "Start"] == out.index[1]
+    assert spans.loc[0, "End"] == out.index[2] + pd.Timedelta(days=1)
+
+def test_run_spans_empty_without_runs():
+    out = movement_direction(ohlc_frame([5, 5, 5], **WEEKDAYS))
+    assert run_spans(out).empty
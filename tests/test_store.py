@@ -0,0 +1,170 @@
+# tests/test_store.py
+import multiprocessing
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance as yf
+from src.data import dataset
+from src.store import BarStore, period_start
+from conftest import ohlc_frame
+
+def df_ohlcv(n=400):
+    """yfinance-shaped history: random-walk prices, int64 Volume (row * 100) and Dividends."""
+    close = 100 + np.cumsum(np.random.default_rng(0).standard_normal(n))
+    df = ohlc_frame(close, start="2024-01-01", freq="B", tz="America/New_York", name="Date",
+                    volume=np.arange(n, dtype=np.int64) * 100)
+    df["Dividends"] = 0.0
+    return df
+
+def _is_memmap_backed(arr):
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = arr.base
+    return False
+
+
+# ---------- round trip ----------
+def test_round_trip_matches_input(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = df_ohlcv()
+    store.write("AAPL", df)
+    out = store.open("AAPL")
+    pd.testing.assert_frame_equal(out.copy(), df, check_freq=False)  # copy: compare values, not memmap class
+    assert "AAPL" in store and store.tickers() == ["AAPL"]
+
+def test_columns_are_read_only_memmaps(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv())
+    close = store.open("AAPL")["Close"].to_numpy()
+    assert _is_memmap_backed(close)
+    assert not close.flags.writeable
+
+def test_fixed_dtypes_per_field(tmp_path):
+    store = BarStore(str(tmp_path), price_dtype="float32")
+    store.write("AAPL", df_ohlcv())
+    out = store.open("AAPL")
+    assert out["Close"].dtype == np.float32
+    assert out["Volume"].dtype == np.int64
+    assert out["Dividends"].dtype == np.float64
+
+def test_rewrite_replaces_ticker(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv(n=10))
+    store.write("AAPL", df_ohlcv(n=20))
+    assert len(store.open("AAPL")) == 20
+    assert store.tickers() == ["AAPL"]
+
+def test_open_missing_ticker_raises_keyerror(tmp_path):
+    with pytest.raises(KeyError):
+        BarStore(str(tmp_path)).open("MSFT")
+
+
+def test_rewrites_keep_only_recent_versions(tmp_path):
+    store = BarStore(str(tmp_path))
+    for n in (10, 20, 30, 40):
+        store.write("AAPL", df_ohlcv(n=n))
+    versions = [d for d in os.listdir(tmp_path / "AAPL") if d.startswith("v")]
+    assert len(versions) == 2
+    assert len(store.open("AAPL")) == 40
+
+def test_open_view_survives_later_writes(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv(n=10))
+    view = store.open("AAPL")
+    for n in (20, 30, 40):
+        store.write("AAPL", df_ohlcv(n=n))
+    assert len(view) == 10 and np.isfinite(view["Close"].to_numpy()).all()
+
+
+# ---------- concurrency ----------
+def _write_many(root, sizes):
+    store = BarStore(root)
+    for n in sizes:
+        store.write("AAPL", df_ohlcv(n=n))
+
+def test_concurrent_readers_never_see_torn_frames(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv(n=10))
+    sizes = [10 + 5 * (i % 7) for i in range(60)]
+    errors = []
+
+    def read():
+        for _ in range(200):
+            try:
+                out = store.open("AAPL")
+                assert len(out["Close"]) == len(out.index) == int(out["Volume"].iloc[-1]) // 100 + 1
+            except Exception as e:
+                errors.append(e)
+
+    writers = [threading.Thread(target=_write_many, args=(str(tmp_path), sizes)) for _ in range(2)]
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for t in writers + readers:
+        t.start()
+    for t in writers + readers:
+        t.join()
+    assert errors == []
+
+def test_concurrent_process_writers_leave_a_clean_ticker(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_many, args=(str(tmp_path), [10 + i, 20 + i, 30 + i])) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    store = BarStore(str(tmp_path))
+    assert store.tickers() == ["AAPL"]
+    assert sorted(os.listdir(tmp_path)) == ["AAPL"]
+    assert len([d for d in os.listdir(tmp_path / "AAPL") if d.startswith("v")]) == 2
+    assert len(store.open("AAPL")) in (30, 31, 32, 33)
+
+def test_dataset_refetches_when_open_fails_after_covers(tmp_path, monkeypatch):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv(n=10), period="max")
+    opened = []
+
+    def flaky_open(ticker, period="max"):
+        opened.append(ticker)
+        if len(opened) == 1:
+            raise FileNotFoundError("version pruned")
+        return BarStore.open(store, ticker, period)
+
+    monkeypatch.setattr(store, "open", flaky_open)
+    monkeypatch.setattr(yf.Ticker, "history", lambda self, period="1y", **kw: df_ohlcv(n=25))
+    assert len(dataset("AAPL", "max", store=store)) == 25
+
+
+# ---------- periods ----------
+def test_open_trims_history_to_period(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = df_ohlcv(n=400)
+    store.write("AAPL", df)
+    out = store.open("AAPL", "3mo")
+    assert out.index[-1] == df.index[-1]
+    assert out.index[0] >= df.index[-1] - pd.DateOffset(months=3)
+    assert len(out) == (df.index >= df.index[-1] - pd.DateOffset(months=3)).sum()
+
+def test_covers_only_shorter_or_equal_periods(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("AAPL", df_ohlcv(), period="1y")
+    assert store.covers("AAPL", "6mo") and store.covers("AAPL", "1y")
+    assert not store.covers("AAPL", "2y") and not store.covers("AAPL", "max")
+    assert not store.covers("MSFT", "1mo")
+
+def test_stale_ticker_is_not_covered(tmp_path):
+    store = BarStore(str(tmp_path), max_age=-1)
+    store.write("AAPL", df_ohlcv(), period="max")
+    assert not store.covers("AAPL", "1mo")
+
+def test_period_start_parses_yfinance_periods():
+    last = pd.Timestamp("2025-06-30")
+    assert period_start(last, "5d") == pd.Timestamp("2025-06-25")
+    assert period_start(last, "3mo") == pd.Timestamp("2025-03-30")
+    assert period_start(last, "2y") == pd.Timestamp("2023-06-30")
+    assert period_start(last, "ytd") == pd.Timestamp("2025-01-01")
+    assert period_start(last, "max") is None
+    with pytest.raises(ValueError):
+        period_start(last, "forever")